@@ -1,15 +1,18 @@
-from flask import Flask, render_template, request, session, redirect, url_for, send_file, jsonify
+from flask import Flask, render_template, request, session, redirect, url_for, send_from_directory, jsonify
 from werkzeug.utils import secure_filename
 import os
 from config import Config
 from services.presentation_agent import PresentationAgent
+from services.history_store import HistoryStore
+from services.storage import FileStorage
 import threading
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
+# Content-addressed uploads, job-scoped outputs, background retention
+storage = FileStorage(app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'])
+storage.start_gc()
 
 # Progress tracking
 progress_data = {}
@@ -40,10 +43,9 @@ def index():
         if not presentation.filename.endswith('.pptx'):
             return render_template('index.html', error='Only .pptx files are supported')
         
-        # Save files
+        # Save files by content hash so concurrent uploads never overwrite each other
         pptx_filename = secure_filename(presentation.filename)
-        pptx_path = os.path.join(app.config['UPLOAD_FOLDER'], pptx_filename)
-        presentation.save(pptx_path)
+        pptx_path = storage.save_upload(presentation)
         
         # Handle optional files
         previous_mbr_path = None
@@ -52,16 +54,12 @@ def index():
         if 'previous_mbr' in request.files:
             previous_mbr = request.files['previous_mbr']
             if previous_mbr and previous_mbr.filename and allowed_file(previous_mbr.filename):
-                filename = secure_filename(previous_mbr.filename)
-                previous_mbr_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                previous_mbr.save(previous_mbr_path)
+                previous_mbr_path = storage.save_upload(previous_mbr)
         
         if 'sa_notes' in request.files:
             sa_notes = request.files['sa_notes']
             if sa_notes and sa_notes.filename and allowed_file(sa_notes.filename):
-                filename = secure_filename(sa_notes.filename)
-                sa_notes_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                sa_notes.save(sa_notes_path)
+                sa_notes_path = storage.save_upload(sa_notes)
         
         additional_text = request.form.get('additional_text', '').strip()
         
@@ -97,6 +95,10 @@ def process():
     session_id = str(uuid.uuid4())
     session['session_id'] = session_id
     
+    # Drop the previous job's results so its checklist and history run can't leak into this one
+    for key in ('output_files', 'history_run_id', 'slide_analyses', 'action_items'):
+        session.pop(key, None)
+    
     # Initialize progress
     progress_data[session_id] = {'current': 0, 'total': 0, 'complete': False}
     
@@ -107,9 +109,15 @@ def process():
         'audience_type': session['audience_type'],
         'previous_mbr_path': session.get('previous_mbr_path'),
         'sa_notes_path': session.get('sa_notes_path'),
-        'additional_text': session.get('additional_text', '')
+        'additional_text': session.get('additional_text', ''),
+        'presentation_name': session.get('presentation_name')
     }
     
+    # Keep this job's inputs and outputs out of garbage collection while it runs
+    session_copy['output_folder'] = storage.job_output_folder(session_id)
+    storage.pin(session_id, session_copy['pptx_path'], session_copy['previous_mbr_path'],
+                session_copy['sa_notes_path'], session_copy['output_folder'])
+    
     # Start processing in background thread
     thread = threading.Thread(target=process_presentation, args=(session_id, session_copy))
     thread.start()
@@ -139,17 +147,29 @@ def process_presentation(session_id, session_data):
             slide_analyses,
             prs,
             session_data['customer_name'],
-            app.config['OUTPUT_FOLDER']
+            session_data['output_folder']
+        )
+        
+        # Index analyses for later runs and the download/follow-up pages
+        run_id = agent.record_history(
+            slide_analyses,
+            session_data['customer_name'],
+            session_data.get('presentation_name')
         )
         
         # Store results in progress_data for retrieval
         progress_data[session_id]['files'] = files
-        progress_data[session_id]['slide_analyses'] = slide_analyses
+        progress_data[session_id]['history_run_id'] = run_id
+        if run_id is None:
+            progress_data[session_id]['slide_analyses'] = slide_analyses
         progress_data[session_id]['complete'] = True
         
     except Exception as e:
         print(f"Processing error: {str(e)}")
         progress_data[session_id]['error'] = str(e)
+    finally:
+        storage.unpin(session_id, session_data['pptx_path'], session_data.get('previous_mbr_path'),
+                      session_data.get('sa_notes_path'), session_data['output_folder'])
 
 @app.route('/processing')
 def processing():
@@ -171,36 +191,48 @@ def download_page():
     # Get files from progress_data if available
     if session_id and session_id in progress_data:
         files = progress_data[session_id].get('files')
+        run_id = progress_data[session_id].get('history_run_id')
         slide_analyses = progress_data[session_id].get('slide_analyses')
         if files:
             session['output_files'] = files
+        if run_id:
+            session['history_run_id'] = run_id
         if slide_analyses:
             session['slide_analyses'] = slide_analyses
     
     files = session.get('output_files', {})
     
-    # Extract action items for checklist
-    action_items = []
-    slide_analyses = session.get('slide_analyses', [])
-    for analysis in slide_analyses:
-        items = analysis.get('action_items', [])
-        real_items = [item for item in items if 'none identified' not in item.lower()]
-        for item in real_items:
-            action_items.append({
-                'text': item,
-                'slide_num': analysis['slide_index'] + 1
-            })
+    # Extract action items for checklist, from the history index when available
+    run_id = session.get('history_run_id')
+    if run_id:
+        action_items = HistoryStore().get_action_items(run_id)
+    else:
+        action_items = []
+        slide_analyses = session.get('slide_analyses', [])
+        for analysis in slide_analyses:
+            items = analysis.get('action_items', [])
+            real_items = [item for item in items if 'none identified' not in item.lower()]
+            for item in real_items:
+                action_items.append({
+                    'text': item,
+                    'slide_num': analysis['slide_index'] + 1
+                })
     
     # Store in session for later retrieval
     session['action_items'] = action_items
     
-    return render_template('download_direct.html', files=files, action_items=action_items)
+    return render_template('download_direct.html', files=files, action_items=action_items, job_id=session_id)
 
 @app.route('/generate_followup', methods=['POST'])
 def generate_followup():
     from services.bedrock_service import BedrockService
     from datetime import datetime
     
+    # Follow-up files live in the job's output folder, so there must be a job
+    job_id = session.get('session_id')
+    if not job_id:
+        return redirect(url_for('index'))
+    
     selected_indices = request.form.getlist('selected_items')
     if not selected_indices:
         return redirect(url_for('download_page'))
@@ -216,33 +248,40 @@ def generate_followup():
     
     customer_name = session.get('customer_name', 'Customer')
     
+    # Remember which items the customer agreed to for next month's MBR
+    run_id = session.get('history_run_id')
+    if run_id:
+        HistoryStore().mark_agreed(run_id, [item['id'] for item in selected_items if 'id' in item])
+    
     # Generate email and guide
     bedrock = BedrockService()
     email_draft = bedrock.generate_followup_email(customer_name, selected_items)
     implementation_guide = bedrock.generate_implementation_guide(customer_name, selected_items)
     
-    # Save files
+    # Save files alongside the job's other outputs
+    output_folder = storage.job_output_folder(job_id)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     email_filename = f"{customer_name}_FollowupEmail_{timestamp}.txt"
-    email_path = os.path.join(app.config['OUTPUT_FOLDER'], email_filename)
+    email_path = os.path.join(output_folder, email_filename)
     with open(email_path, 'w') as f:
         f.write(email_draft)
     
     guide_filename = f"{customer_name}_ImplementationGuide_{timestamp}.md"
-    guide_path = os.path.join(app.config['OUTPUT_FOLDER'], guide_filename)
+    guide_path = os.path.join(output_folder, guide_filename)
     with open(guide_path, 'w') as f:
         f.write(implementation_guide)
     
     return render_template('followup.html', 
                          email_draft=email_draft,
                          email_file=email_filename,
-                         guide_file=guide_filename)
+                         guide_file=guide_filename,
+                         job_id=job_id)
 
-@app.route('/download/<filename>')
-def download(filename):
-    filepath = os.path.join(app.config['OUTPUT_FOLDER'], filename)
-    return send_file(filepath, as_attachment=True)
+@app.route('/download/<job_id>/<filename>')
+def download(job_id, filename):
+    job_folder = os.path.join(app.config['OUTPUT_FOLDER'], secure_filename(job_id))
+    return send_from_directory(job_folder, filename, as_attachment=True)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,188 @@
+"""
+Headless command-line entry point for the MBR pipeline.
+
+    python -m cli run deck.pptx --customer "Acme" --audience Technical
+    python -m cli run decks/ --customer "Acme" --audience Mixed --sa-notes notes.pdf
+    python -m cli history "savings plans" --customer "Acme"
+    python -m cli bench
+
+Heavy dependencies (boto3, python-pptx, PyPDF2) are imported only when a
+command actually needs them, and Flask is never imported.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+AUDIENCE_TYPES = ['Technical', 'Business', 'Mixed']
+HEAVY_MODULES = ['flask', 'boto3', 'botocore', 'pptx', 'PyPDF2']
+
+# `python -m cli --help` should add no more than this over a bare interpreter
+STARTUP_TARGET_MS = 100
+
+
+def find_decks(paths):
+    decks = []
+    for path in paths:
+        if os.path.isdir(path):
+            decks.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith('.pptx')
+            )
+        elif path.lower().endswith('.pptx'):
+            decks.append(path)
+        else:
+            print(f"Skipping {path}: not a .pptx file or directory")
+    return decks
+
+
+def run(args):
+    decks = find_decks(args.paths)
+    if not decks:
+        print("No .pptx decks found")
+        return 1
+
+    from services.presentation_agent import PresentationAgent
+    from services.storage import FileStorage
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        return _run_decks(args, decks, PresentationAgent())
+
+    # Default to a run-scoped folder under outputs/, pinned so the web app's GC leaves it alone mid-run
+    storage = FileStorage()
+    job_id = f"cli-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{os.getpid()}"
+    args.output_dir = storage.job_output_folder(job_id)
+    storage.pin(job_id, args.output_dir)
+    try:
+        return _run_decks(args, decks, PresentationAgent())
+    finally:
+        storage.unpin(job_id, args.output_dir)
+
+
+def _run_decks(args, decks, agent):
+    failures = 0
+
+    for deck in decks:
+        name = os.path.basename(deck)
+        start = time.monotonic()
+
+        def progress_callback(current, total):
+            print(f"[{name}] Analyzing slide {current}/{total}", flush=True)
+
+        try:
+            slide_analyses, prs = agent.process_presentation(
+                deck,
+                args.customer,
+                args.audience,
+                args.previous_mbr,
+                args.sa_notes,
+                args.context,
+                progress_callback=progress_callback
+            )
+            files = agent.generate_outputs(slide_analyses, prs, args.customer, args.output_dir)
+        except Exception as e:
+            print(f"[{name}] Processing error: {e}")
+            failures += 1
+            continue
+
+        agent.record_history(slide_analyses, args.customer, name)
+        print(f"[{name}] Done in {time.monotonic() - start:.1f}s")
+        for kind, filename in files.items():
+            print(f"  {kind}: {os.path.join(args.output_dir, filename)}")
+
+    return 1 if failures else 0
+
+
+def history(args):
+    from services.history_store import HistoryStore
+
+    store = HistoryStore()
+    if args.query:
+        items = store.search_action_items(args.query, args.customer, limit=args.limit)
+    elif args.customer:
+        created_at, items = store.previous_action_items(args.customer)
+        items = [dict(item, customer=args.customer, deck=None, created_at=created_at) for item in items]
+    else:
+        print("Provide a search query, --customer, or both")
+        return 1
+
+    if not items:
+        print("No matching action items")
+    for item in items:
+        agreed = ' [agreed]' if item['agreed'] else ''
+        print(f"{item['created_at'][:10]}  {item['customer']}  Slide {item['slide_num']}{agreed}: {item['text']}")
+    return 0
+
+
+def _median_ms(command, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def bench(args):
+    """Measure CLI startup against a bare interpreter and check for eager heavy imports."""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(cwd)
+
+    baseline = _median_ms([sys.executable, '-c', 'pass'], args.runs)
+    cli_startup = _median_ms([sys.executable, '-m', 'cli', '--help'], args.runs)
+    overhead = cli_startup - baseline
+
+    probe = subprocess.run(
+        [sys.executable, '-c',
+         'import sys, cli; print(",".join(m for m in %r if m in sys.modules))' % HEAVY_MODULES],
+        check=True, capture_output=True, text=True
+    )
+    eager = [m for m in probe.stdout.strip().split(',') if m]
+
+    passed = overhead <= STARTUP_TARGET_MS and not eager
+    print(f"Interpreter startup:   {baseline:.1f} ms (median of {args.runs})")
+    print(f"CLI startup (--help):  {cli_startup:.1f} ms")
+    print(f"CLI overhead:          {overhead:.1f} ms (target <= {STARTUP_TARGET_MS} ms)")
+    print(f"Heavy modules loaded:  {', '.join(eager) if eager else 'none'}")
+    print(f"Result:                {'PASS' if passed else 'FAIL'}")
+    return 0 if passed else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cli', description='MBR Automation Agent (headless)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Analyze decks and write talking points, action items and Q&A')
+    run_parser.add_argument('paths', nargs='+', help='.pptx files or directories containing them')
+    run_parser.add_argument('--customer', required=True, help='Customer name')
+    run_parser.add_argument('--audience', required=True, choices=AUDIENCE_TYPES, help='Audience type')
+    run_parser.add_argument('--previous-mbr', help='Previous MBR notes (PDF/TXT)')
+    run_parser.add_argument('--sa-notes', help='SA/CSM notes (PDF/TXT)')
+    run_parser.add_argument('--context', default='', help='Additional context text')
+    run_parser.add_argument('--output-dir', help='Where to write outputs (default: a new folder per run under outputs/)')
+    run_parser.set_defaults(func=run)
+
+    history_parser = commands.add_parser('history', help='Look up action items from past runs')
+    history_parser.add_argument('query', nargs='?', help='Full-text search over action items')
+    history_parser.add_argument('--customer', help='Restrict to one customer; alone, shows last month\'s items')
+    history_parser.add_argument('--limit', type=int, default=50, help='Maximum results')
+    history_parser.set_defaults(func=history)
+
+    bench_parser = commands.add_parser('bench', help='Measure CLI startup time')
+    bench_parser.add_argument('--runs', type=int, default=10, help='Runs per measurement')
+    bench_parser.set_defaults(func=bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
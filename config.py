@@ -7,9 +7,28 @@ class Config:
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
     UPLOAD_FOLDER = 'uploads'
     OUTPUT_FOLDER = 'outputs'
+    UPLOAD_RETENTION_HOURS = float(os.getenv('UPLOAD_RETENTION_HOURS', '72'))
+    UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(1024 * 1024 * 1024)))  # 1GB
+    OUTPUT_RETENTION_HOURS = float(os.getenv('OUTPUT_RETENTION_HOURS', '168'))
+    OUTPUT_MAX_BYTES = int(os.getenv('OUTPUT_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))  # 2GB
+    STORAGE_GC_INTERVAL_SECONDS = float(os.getenv('STORAGE_GC_INTERVAL_SECONDS', '600'))
+    STORAGE_GC_GRACE_SECONDS = float(os.getenv('STORAGE_GC_GRACE_SECONDS', '3600'))
+    HISTORY_DB_PATH = os.getenv('HISTORY_DB_PATH', 'history.db')
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB
     ALLOWED_EXTENSIONS = {'pptx', 'pdf', 'txt'}
     
     AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
     BEDROCK_MODEL_ID = os.getenv('BEDROCK_MODEL_ID', 'us.anthropic.claude-3-5-sonnet-20241022-v2:0')
+    BEDROCK_ENDPOINTS = os.getenv('BEDROCK_ENDPOINTS', '')
+    BEDROCK_ENDPOINT_COOLDOWN = float(os.getenv('BEDROCK_ENDPOINT_COOLDOWN', '30'))
+    BEDROCK_ENDPOINT_MAX_COOLDOWN = float(os.getenv('BEDROCK_ENDPOINT_MAX_COOLDOWN', '600'))
+    BEDROCK_CALL_TIMEOUT = float(os.getenv('BEDROCK_CALL_TIMEOUT', '120'))
+    BEDROCK_SLIDE_RETRIES = int(os.getenv('BEDROCK_SLIDE_RETRIES', '0'))
+    BEDROCK_READ_TIMEOUT = float(os.getenv('BEDROCK_READ_TIMEOUT', '60'))
+    BEDROCK_MAX_ATTEMPTS = int(os.getenv('BEDROCK_MAX_ATTEMPTS', '5'))
+    BEDROCK_BACKOFF_BASE = float(os.getenv('BEDROCK_BACKOFF_BASE', '1'))
+    BEDROCK_BACKOFF_MAX = float(os.getenv('BEDROCK_BACKOFF_MAX', '20'))
+    BEDROCK_HEDGE_ENABLED = os.getenv('BEDROCK_HEDGE_ENABLED', 'true').lower() == 'true'
+    BEDROCK_HEDGE_PERCENTILE = float(os.getenv('BEDROCK_HEDGE_PERCENTILE', '95'))
+    BEDROCK_HEDGE_BUDGET = float(os.getenv('BEDROCK_HEDGE_BUDGET', '0.1'))
     OUTLOOK_ACCESS_TOKEN = os.getenv('OUTLOOK_ACCESS_TOKEN', '')
@@ -1,17 +1,92 @@
-import boto3
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ConnectTimeoutError, ReadTimeoutError
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 import json
-import os
+import random
+import threading
+import time
+from config import Config
+from services.endpoint_pool import EndpointPool, is_endpoint_error
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent Bedrock call latencies and hedge usage.
+    Shared across BedrockService instances so each job starts with history.
+    """
+    
+    def __init__(self, window=100, min_samples=5):
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._hedged = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+    
+    def record_call(self, hedged):
+        with self._lock:
+            self._hedged.append(hedged)
+    
+    def percentile(self, pct):
+        """Latency at the given percentile, or None until enough samples exist."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+    
+    def can_hedge(self, budget):
+        """True while hedged calls stay within `budget` (fraction) of recent calls."""
+        if budget <= 0:
+            return False
+        with self._lock:
+            calls = len(self._hedged) + 1
+            hedges = sum(self._hedged) + 1
+        return hedges <= max(1, budget * calls)
+
+
+_latency_tracker = LatencyTracker()
+
+
+def _start_call(fn, *args):
+    """
+    Run `fn` on its own daemon thread and return a Future for it.
+    A dedicated thread per attempt means a call never queues behind abandoned
+    work, so deadline and hedge clocks measure only the call itself.
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+    
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name='bedrock-call', daemon=True).start()
+    return future
+
 
 class BedrockService:
     def __init__(self):
-        # Use credentials from environment variables
-        self.client = boto3.client(
-            'bedrock-runtime',
-            region_name=os.getenv('AWS_REGION', 'us-east-1'),
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
-        self.model_id = os.getenv('BEDROCK_MODEL_ID', 'us.anthropic.claude-3-5-sonnet-20241022-v2:0')
+        # Per-call deadline and hedging settings
+        self.call_timeout = Config.BEDROCK_CALL_TIMEOUT
+        self.hedge_enabled = Config.BEDROCK_HEDGE_ENABLED
+        self.hedge_percentile = Config.BEDROCK_HEDGE_PERCENTILE
+        self.hedge_budget = Config.BEDROCK_HEDGE_BUDGET
+        
+        # Region/model endpoints, shared across jobs. Each attempt gets its own
+        # read budget below the call deadline; retries and backoff happen in
+        # _invoke, where they can fail over and stop at the deadline.
+        self.pool = EndpointPool.shared(BotoConfig(
+            connect_timeout=min(10, self.call_timeout),
+            read_timeout=min(Config.BEDROCK_READ_TIMEOUT, self.call_timeout),
+            retries={'total_max_attempts': 1}
+        ))
     
     def generate_followup_email(self, customer_name, selected_items):
         items_text = "\n".join([f"- {item['text']} (Slide {item['slide_num']})" for item in selected_items])
@@ -35,9 +110,7 @@ Keep it brief and actionable. Use a professional but friendly tone."""
             "messages": [{"role": "user", "content": prompt}]
         })
         
-        response = self.client.invoke_model(modelId=self.model_id, body=body)
-        response_body = json.loads(response['body'].read())
-        return response_body['content'][0]['text']
+        return self._invoke(body)
     
     def generate_implementation_guide(self, customer_name, selected_items):
         items_text = "\n".join([f"- {item['text']} (Slide {item['slide_num']})" for item in selected_items])
@@ -62,9 +135,7 @@ Format as a structured markdown document."""
             "messages": [{"role": "user", "content": prompt}]
         })
         
-        response = self.client.invoke_model(modelId=self.model_id, body=body)
-        response_body = json.loads(response['body'].read())
-        return response_body['content'][0]['text']
+        return self._invoke(body)
     
     def analyze_slide(self, slide_content, customer_name, audience_type, context):
         prompt = f"""You are an expert AWS Technical Account Manager preparing for an MBR with {customer_name} ({audience_type} audience).
@@ -112,13 +183,93 @@ A: [Detailed answer with AWS documentation reference: https://docs.aws.amazon.co
             "messages": [{"role": "user", "content": prompt}]
         })
         
-        response = self.client.invoke_model(
-            modelId=self.model_id,
-            body=body
-        )
+        return self._parse_response(self._invoke_hedged(body))
+    
+    def _invoke(self, body, endpoint=None, track_latency=False, deadline=None):
+        """
+        Invoke on `endpoint` (or a pool pick). Throttled or failing endpoints
+        are drained and the call fails over to the next untried one; once every
+        endpoint has been tried it backs off and retries, up to
+        BEDROCK_MAX_ATTEMPTS attempts or until `deadline` (a time.monotonic()
+        value) would pass.
+        """
+        max_attempts = max(1, Config.BEDROCK_MAX_ATTEMPTS)
+        tried = set()
+        endpoint = endpoint or self.pool.choose()
+        for attempt in range(1, max_attempts + 1):
+            tried.add(endpoint)
+            start = time.monotonic()
+            try:
+                response = endpoint.client.invoke_model(modelId=endpoint.model_id, body=body)
+                response_body = json.loads(response['body'].read())
+            except Exception as e:
+                if not is_endpoint_error(e) or attempt == max_attempts:
+                    raise
+                self.pool.mark_failure(endpoint)
+                
+                delay = 0
+                endpoint = self.pool.choose(exclude=tried)
+                if endpoint is None:
+                    # Every endpoint has failed this call; back off with jitter before going round again
+                    tried = set()
+                    endpoint = self.pool.choose()
+                    delay = random.uniform(0, min(Config.BEDROCK_BACKOFF_MAX,
+                                                  Config.BEDROCK_BACKOFF_BASE * 2 ** (attempt - 1)))
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+                continue
+            self.pool.mark_success(endpoint)
+            if track_latency:
+                # Only slide analyses feed the hedge threshold they are compared against
+                _latency_tracker.record_latency(time.monotonic() - start)
+            return response_body['content'][0]['text']
+    
+    def _invoke_hedged(self, body):
+        """
+        Invoke with a hard deadline. If the call runs past the recent latency
+        percentile, fire one duplicate and return whichever finishes first.
+        Raises TimeoutError when the deadline passes or every attempt failed
+        on endpoint faults (timeouts, throttling, 5xx).
+        """
+        start = time.monotonic()
+        deadline = start + self.call_timeout
+        primary = self.pool.choose()
+        pending = {_start_call(self._invoke, body, primary, True, deadline)}
+        hedged = False
+        
+        hedge_delay = _latency_tracker.percentile(self.hedge_percentile) if self.hedge_enabled else None
+        if hedge_delay is not None and hedge_delay < self.call_timeout:
+            done, _ = wait(pending, timeout=hedge_delay)
+            if not done and _latency_tracker.can_hedge(self.hedge_budget):
+                # Prefer a different endpoint for the duplicate
+                hedge_endpoint = self.pool.choose(exclude={primary}) or primary
+                pending.add(_start_call(self._invoke, body, hedge_endpoint, True, deadline))
+                hedged = True
+        _latency_tracker.record_call(hedged)
+        
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # Losing call finishes within its read timeout and is ignored
+                    return future.result()
+                error = error or future.exception()
         
-        response_body = json.loads(response['body'].read())
-        return self._parse_response(response_body['content'][0]['text'])
+        # Timed-out calls count as samples too, or the hedge threshold drifts low
+        if error and not pending:
+            if isinstance(error, (ReadTimeoutError, ConnectTimeoutError)):
+                _latency_tracker.record_latency(time.monotonic() - start)
+            if is_endpoint_error(error):
+                # Attempt timeouts and an exhausted pool end the call the same way as its deadline
+                raise TimeoutError(f"Bedrock endpoints unavailable: {error}") from error
+            raise error
+        _latency_tracker.record_latency(self.call_timeout)
+        raise TimeoutError(f"Bedrock call exceeded {self.call_timeout:.0f}s deadline")
     
     def _parse_response(self, text):
         talking_points = []
@@ -1,5 +1,5 @@
-import PyPDF2
 import os
+from services.history_store import HistoryStore
 
 class ContextGatherer:
     """
@@ -8,14 +8,18 @@ class ContextGatherer:
     """
     
     @staticmethod
-    def gather_context(previous_mbr_file=None, sa_notes_file=None, additional_text=""):
+    def gather_context(previous_mbr_file=None, sa_notes_file=None, additional_text="", customer_name=None):
         context_parts = []
         
-        # Read previous MBR notes
+        # Read previous MBR notes, or fall back to last month's action items from history
         if previous_mbr_file:
             content = ContextGatherer._read_file(previous_mbr_file)
             if content:
                 context_parts.append(f"PREVIOUS MBR NOTES:\n{content}")
+        elif customer_name:
+            content = ContextGatherer._previous_action_items(customer_name)
+            if content:
+                context_parts.append(content)
         
         # Read SA/CSM notes
         if sa_notes_file:
@@ -33,6 +37,21 @@ class ContextGatherer:
         
         return "\n\n".join(context_parts) if context_parts else "No additional context provided."
     
+    @staticmethod
+    def _previous_action_items(customer_name):
+        try:
+            created_at, items = HistoryStore().previous_action_items(customer_name)
+        except Exception as e:
+            print(f"Error reading analysis history: {e}")
+            return ""
+        
+        if not items:
+            return ""
+        
+        label = "AGREED ACTION ITEMS" if any(item['agreed'] for item in items) else "ACTION ITEMS"
+        lines = [f"- {item['text']} (Slide {item['slide_num']})" for item in items]
+        return f"PREVIOUS MBR {label} ({created_at[:10]}):\n" + "\n".join(lines)
+    
     @staticmethod
     def _read_file(filepath):
         ext = os.path.splitext(filepath)[1].lower()
@@ -50,6 +69,9 @@ class ContextGatherer:
     
     @staticmethod
     def _read_pdf(filepath):
+        # Imported here so text-only context never loads PyPDF2
+        import PyPDF2
+        
         text = []
         with open(filepath, 'rb') as f:
             reader = PyPDF2.PdfReader(f)
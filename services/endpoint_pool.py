@@ -0,0 +1,139 @@
+import boto3
+from botocore.exceptions import ClientError, ConnectTimeoutError, EndpointConnectionError, ReadTimeoutError
+import json
+import os
+import random
+import threading
+import time
+from config import Config
+
+# Errors that mean the endpoint itself is unhealthy, not the request. Access and
+# model-not-found errors are per region (model access is granted per region),
+# so they drain that endpoint and fail over rather than failing the call.
+DRAIN_ERROR_CODES = {
+    'ThrottlingException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'ModelTimeoutException',
+    'InternalServerException',
+    'TooManyRequestsException',
+    'AccessDeniedException',
+    'ResourceNotFoundException',
+}
+
+# Connection-level failures; credential and parameter errors are deliberately excluded
+DRAIN_EXCEPTIONS = (EndpointConnectionError, ConnectTimeoutError, ReadTimeoutError)
+
+
+def is_endpoint_error(error):
+    if isinstance(error, ClientError):
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return error.response.get('Error', {}).get('Code') in DRAIN_ERROR_CODES or status >= 500
+    return isinstance(error, DRAIN_EXCEPTIONS)
+
+
+class BedrockEndpoint:
+    def __init__(self, region, model_id, weight=1, endpoint_url=None, client_config=None):
+        self.region = region
+        self.model_id = model_id
+        self.weight = weight
+        self.client = boto3.client(
+            'bedrock-runtime',
+            region_name=region,
+            endpoint_url=endpoint_url,
+            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+            config=client_config
+        )
+        self.failures = 0
+        self.drained_until = 0.0
+
+    def is_healthy(self, now):
+        return now >= self.drained_until
+
+    def __repr__(self):
+        return f"BedrockEndpoint({self.region}, {self.model_id})"
+
+
+class EndpointPool:
+    """
+    Weighted pool of Bedrock region/model endpoints.
+    Endpoints that throttle or error are drained with exponential cooldown
+    and rejoin the pool once the cooldown expires.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, endpoints, base_cooldown=30, max_cooldown=600):
+        if not endpoints:
+            raise ValueError("EndpointPool requires at least one endpoint")
+        self.endpoints = endpoints
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, client_config=None):
+        """Process-wide pool built from Config, so health survives across jobs."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_config(client_config)
+            return cls._shared
+
+    @classmethod
+    def from_config(cls, client_config=None):
+        """
+        Reads Config.BEDROCK_ENDPOINTS as a JSON list of
+        {"region": ..., "model_id": ..., "weight": ..., "endpoint_url": ...}.
+        Falls back to a single AWS_REGION / BEDROCK_MODEL_ID endpoint.
+        """
+        raw = Config.BEDROCK_ENDPOINTS.strip()
+        if raw:
+            specs = json.loads(raw)
+        else:
+            specs = [{'region': Config.AWS_REGION, 'model_id': Config.BEDROCK_MODEL_ID}]
+
+        endpoints = [
+            BedrockEndpoint(
+                spec['region'],
+                spec['model_id'],
+                weight=float(spec.get('weight', 1)),
+                endpoint_url=spec.get('endpoint_url'),
+                client_config=client_config
+            )
+            for spec in specs
+        ]
+        return cls(
+            endpoints,
+            base_cooldown=Config.BEDROCK_ENDPOINT_COOLDOWN,
+            max_cooldown=Config.BEDROCK_ENDPOINT_MAX_COOLDOWN
+        )
+
+    def choose(self, exclude=()):
+        """
+        Weighted random pick among healthy endpoints not in `exclude`.
+        If every candidate is drained, returns the one that recovers soonest.
+        Returns None only when `exclude` covers the whole pool.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [ep for ep in self.endpoints if ep not in exclude]
+            if not candidates:
+                return None
+            healthy = [ep for ep in candidates if ep.is_healthy(now) and ep.weight > 0]
+            if not healthy:
+                return min(candidates, key=lambda ep: ep.drained_until)
+        return random.choices(healthy, weights=[ep.weight for ep in healthy])[0]
+
+    def mark_success(self, endpoint):
+        with self._lock:
+            endpoint.failures = 0
+            endpoint.drained_until = 0.0
+
+    def mark_failure(self, endpoint):
+        with self._lock:
+            endpoint.failures += 1
+            cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** (endpoint.failures - 1))
+            endpoint.drained_until = time.monotonic() + cooldown
+        print(f"Draining {endpoint} for {cooldown:.0f}s after {endpoint.failures} failure(s)")
@@ -0,0 +1,192 @@
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    customer TEXT NOT NULL,
+    customer_key TEXT NOT NULL,
+    deck TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_customer_date ON runs (customer_key, created_at);
+
+CREATE TABLE IF NOT EXISTS slide_analyses (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    slide_index INTEGER NOT NULL,
+    talking_points TEXT NOT NULL,
+    action_items TEXT NOT NULL,
+    questions TEXT NOT NULL,
+    PRIMARY KEY (run_id, slide_index)
+);
+
+CREATE TABLE IF NOT EXISTS action_items (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    slide_index INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    agreed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS action_items_run ON action_items (run_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS action_items_fts USING fts5 (
+    text, content='action_items', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS action_items_ai AFTER INSERT ON action_items BEGIN
+    INSERT INTO action_items_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS action_items_ad AFTER DELETE ON action_items BEGIN
+    INSERT INTO action_items_fts (action_items_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Databases whose schema this process has already created
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+class HistoryStore:
+    """
+    Local SQLite index of past slide analyses and action items,
+    keyed by customer, deck and date, with full-text search over action items.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Config.HISTORY_DB_PATH
+        key = os.path.abspath(self.db_path)
+        with _init_lock:
+            # Stores are built per request, so only the first one per database pays for the DDL
+            if key not in _initialized:
+                with self._connect() as conn:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(SCHEMA)
+                _initialized.add(key)
+
+    @contextmanager
+    def _connect(self):
+        # One connection per operation keeps the store safe to use from worker threads
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_run(self, customer_name, deck_name, slide_analyses, created_at=None):
+        created_at = created_at or datetime.now().isoformat(timespec='seconds')
+        with self._connect() as conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (customer, customer_key, deck, created_at) VALUES (?, ?, ?, ?)",
+                (customer_name, customer_name.strip().lower(), deck_name, created_at)
+            ).lastrowid
+
+            for analysis in slide_analyses:
+                conn.execute(
+                    "INSERT INTO slide_analyses VALUES (?, ?, ?, ?, ?)",
+                    (run_id, analysis['slide_index'],
+                     json.dumps(analysis['talking_points']),
+                     json.dumps(analysis['action_items']),
+                     json.dumps(analysis['questions']))
+                )
+                real_items = [item for item in analysis['action_items'] if 'none identified' not in item.lower()]
+                conn.executemany(
+                    "INSERT INTO action_items (run_id, slide_index, text) VALUES (?, ?, ?)",
+                    [(run_id, analysis['slide_index'], item) for item in real_items]
+                )
+        return run_id
+
+    def get_slide_analyses(self, run_id):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM slide_analyses WHERE run_id = ? ORDER BY slide_index", (run_id,)
+            ).fetchall()
+        return [{
+            'slide_index': row['slide_index'],
+            'talking_points': json.loads(row['talking_points']),
+            'action_items': json.loads(row['action_items']),
+            'questions': json.loads(row['questions'])
+        } for row in rows]
+
+    def get_action_items(self, run_id):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, slide_index, text, agreed FROM action_items WHERE run_id = ? ORDER BY id",
+                (run_id,)
+            ).fetchall()
+        return [self._action_item(row) for row in rows]
+
+    def mark_agreed(self, run_id, item_ids):
+        """Replace the run's agreed items with `item_ids`."""
+        with self._connect() as conn:
+            conn.execute("UPDATE action_items SET agreed = 0 WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "UPDATE action_items SET agreed = 1 WHERE run_id = ? AND id = ?",
+                [(run_id, item_id) for item_id in item_ids]
+            )
+
+    def previous_action_items(self, customer_name, before=None):
+        """
+        Action items from the customer's most recent MBR month before the current one.
+        Within that month, prefers the latest run with agreed items and returns only
+        those; otherwise returns every item from the latest run. Returns (created_at, items).
+        """
+        before = before or datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        customer_key = customer_name.strip().lower()
+        before = before.isoformat(timespec='seconds')
+        with self._connect() as conn:
+            run = conn.execute(
+                """SELECT r.id, r.created_at,
+                          EXISTS (SELECT 1 FROM action_items a WHERE a.run_id = r.id AND a.agreed) AS has_agreed
+                   FROM runs r
+                   WHERE r.customer_key = ? AND r.created_at < ?
+                     AND r.created_at >= (SELECT substr(max(created_at), 1, 7) FROM runs
+                                          WHERE customer_key = ? AND created_at < ?)
+                   ORDER BY has_agreed DESC, r.created_at DESC
+                   LIMIT 1""",
+                (customer_key, before, customer_key, before)
+            ).fetchone()
+            if run is None:
+                return None, []
+            rows = conn.execute(
+                "SELECT id, slide_index, text, agreed FROM action_items WHERE run_id = ? AND agreed >= ? ORDER BY id",
+                (run['id'], 1 if run['has_agreed'] else 0)
+            ).fetchall()
+        return run['created_at'], [self._action_item(row) for row in rows]
+
+    def search_action_items(self, query, customer_name=None, limit=50):
+        # Quote each term so user input is never parsed as FTS syntax
+        match = ' '.join('"%s"' % term.replace('"', '""') for term in query.split())
+        if not match:
+            return []
+
+        sql = """SELECT a.id, a.slide_index, a.text, a.agreed, r.customer, r.deck, r.created_at
+                 FROM action_items_fts f
+                 JOIN action_items a ON a.id = f.rowid
+                 JOIN runs r ON r.id = a.run_id
+                 WHERE action_items_fts MATCH ?"""
+        params = [match]
+        if customer_name:
+            sql += " AND r.customer_key = ?"
+            params.append(customer_name.strip().lower())
+        sql += " ORDER BY bm25(action_items_fts), r.created_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(self._action_item(row), customer=row['customer'], deck=row['deck'],
+                     created_at=row['created_at']) for row in rows]
+
+    @staticmethod
+    def _action_item(row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'slide_num': row['slide_index'] + 1,
+            'agreed': bool(row['agreed'])
+        }
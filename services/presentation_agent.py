@@ -1,6 +1,8 @@
+from config import Config
 from services.bedrock_service import BedrockService
 from services.pptx_service import PPTXService
 from services.context_gatherer import ContextGatherer
+from services.history_store import HistoryStore
 
 class PresentationAgent:
     def __init__(self):
@@ -11,7 +13,7 @@ class PresentationAgent:
                            previous_mbr=None, sa_notes=None, additional_text="",
                            progress_callback=None):
         # Gather context
-        context = ContextGatherer.gather_context(previous_mbr, sa_notes, additional_text)
+        context = ContextGatherer.gather_context(previous_mbr, sa_notes, additional_text, customer_name)
         
         # Extract slides
         slides_content, prs = self.pptx.extract_slides(pptx_path)
@@ -23,12 +25,7 @@ class PresentationAgent:
             if progress_callback:
                 progress_callback(idx + 1, total_slides)
             
-            analysis = self.bedrock.analyze_slide(
-                slide['content'],
-                customer_name,
-                audience_type,
-                context
-            )
+            analysis = self._analyze_slide(slide, customer_name, audience_type, context)
             
             slide_analyses.append({
                 'slide_index': idx,
@@ -39,6 +36,26 @@ class PresentationAgent:
         
         return slide_analyses, prs
     
+    def _analyze_slide(self, slide, customer_name, audience_type, context):
+        # A slide that misses every deadline gets a placeholder so the deck still completes
+        attempts = 1 + max(0, Config.BEDROCK_SLIDE_RETRIES)
+        for attempt in range(attempts):
+            try:
+                return self.bedrock.analyze_slide(
+                    slide['content'],
+                    customer_name,
+                    audience_type,
+                    context
+                )
+            except TimeoutError as e:
+                print(f"Slide {slide['index'] + 1} analysis timed out (attempt {attempt + 1}): {e}")
+        
+        return {
+            'talking_points': ["Analysis unavailable for this slide (Bedrock request timed out or was throttled)."],
+            'action_items': [],
+            'questions': []
+        }
+    
     def generate_outputs(self, slide_analyses, prs, customer_name, output_folder):
         # Add talking points to presentation
         prs = self.pptx.add_talking_points(prs, slide_analyses)
@@ -55,3 +72,11 @@ class PresentationAgent:
             'action_items': action_file,
             'qa': qa_file
         }
+    
+    def record_history(self, slide_analyses, customer_name, deck_name):
+        # History is best-effort; a store failure must not lose the generated outputs
+        try:
+            return HistoryStore().record_run(customer_name, deck_name, slide_analyses)
+        except Exception as e:
+            print(f"Error recording analysis history: {e}")
+            return None
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from config import Config
+
+PIN_FOLDER = '.pins'
+# Pins left behind by a crashed process stop protecting their paths after this long
+PIN_TTL_SECONDS = 24 * 3600
+
+
+class FileStorage:
+    """
+    Content-addressed upload storage and job-scoped output directories.
+    Uploads are stored once per unique content and shared across jobs;
+    a background pass removes uploads and job outputs past their age or size limits.
+    Pins are marker files on disk, so a GC pass in any process (including the
+    Werkzeug reloader's parent) sees the paths a running job is using.
+    """
+
+    def __init__(self, upload_folder=None, output_folder=None):
+        self.upload_folder = upload_folder or Config.UPLOAD_FOLDER
+        self.output_folder = output_folder or Config.OUTPUT_FOLDER
+        os.makedirs(self.upload_folder, exist_ok=True)
+        os.makedirs(self.output_folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._gc_thread = None
+
+    def save_upload(self, file_storage):
+        """Stream an upload to disk, returning the path named by its SHA-256 digest."""
+        ext = os.path.splitext(file_storage.filename)[1].lower()
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(prefix='.upload-', suffix='.tmp', dir=self.upload_folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: file_storage.stream.read(1024 * 1024), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            path = os.path.join(self.upload_folder, digest.hexdigest() + ext)
+            with self._lock:
+                if os.path.exists(path):
+                    # Already stored; refresh its age so retention counts from last use
+                    os.utime(path)
+                    os.remove(temp_path)
+                else:
+                    os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return path
+
+    def job_output_folder(self, job_id):
+        path = os.path.join(self.output_folder, job_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def pin(self, job_id, *paths):
+        """Protect paths used by a running job from garbage collection."""
+        for path in filter(None, paths):
+            marker = self._pin_marker(job_id, path)
+            os.makedirs(os.path.dirname(marker), exist_ok=True)
+            with open(marker, 'w'):
+                pass
+
+    def unpin(self, job_id, *paths):
+        for path in filter(None, paths):
+            try:
+                os.remove(self._pin_marker(job_id, path))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _pin_marker(job_id, path):
+        path = os.path.abspath(path)
+        return os.path.join(os.path.dirname(path), PIN_FOLDER, f"{os.path.basename(path)}.{job_id}")
+
+    @staticmethod
+    def _pinned_names(folder):
+        """Names in `folder` with a live pin; expired pins are removed."""
+        pin_folder = os.path.join(folder, PIN_FOLDER)
+        if not os.path.isdir(pin_folder):
+            return set()
+
+        names = set()
+        now = time.time()
+        for marker in os.listdir(pin_folder):
+            marker_path = os.path.join(pin_folder, marker)
+            try:
+                if now - os.stat(marker_path).st_mtime > PIN_TTL_SECONDS:
+                    os.remove(marker_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            names.add(marker.rsplit('.', 1)[0])
+        return names
+
+    def collect_garbage(self):
+        removed = self._collect(self.upload_folder, Config.UPLOAD_RETENTION_HOURS, Config.UPLOAD_MAX_BYTES)
+        removed += self._collect(self.output_folder, Config.OUTPUT_RETENTION_HOURS, Config.OUTPUT_MAX_BYTES)
+        return removed
+
+    def start_gc(self):
+        if self._gc_thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    removed = self.collect_garbage()
+                    if removed:
+                        print(f"Storage GC removed {removed} item(s)")
+                except Exception as e:
+                    print(f"Storage GC error: {e}")
+                time.sleep(Config.STORAGE_GC_INTERVAL_SECONDS)
+
+        self._gc_thread = threading.Thread(target=loop, name='storage-gc', daemon=True)
+        self._gc_thread.start()
+
+    def _collect(self, folder, retention_hours, max_bytes):
+        """
+        Remove entries older than the retention period, then the least recently
+        used entries until the folder fits in max_bytes. Entries inside the grace
+        period or pinned by a running job are never removed.
+        """
+        entries = []
+        for name in os.listdir(folder):
+            # Skip dotfiles: .gitkeep and in-flight upload temp files
+            if name.startswith('.'):
+                continue
+            path = os.path.abspath(os.path.join(folder, name))
+            try:
+                mtime, size = self._usage(path)
+            except OSError:
+                # Removed concurrently
+                continue
+            entries.append((mtime, size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for _, listed_size, path in entries:
+            with self._lock:
+                # Re-check just before removing: the entry may have been reused or pinned since listing
+                if os.path.basename(path) in self._pinned_names(folder):
+                    continue
+                try:
+                    mtime, size = self._usage(path)
+                except OSError:
+                    total -= listed_size
+                    continue
+                age = time.time() - mtime
+                expired = age > retention_hours * 3600
+                if not (expired or total > max_bytes) or age < Config.STORAGE_GC_GRACE_SECONDS:
+                    continue
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            total -= listed_size
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _usage(path):
+        """Latest modification time and total size of a file or job directory."""
+        if not os.path.isdir(path):
+            stat = os.stat(path)
+            return stat.st_mtime, stat.st_size
+
+        mtime, size = os.stat(path).st_mtime, 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                stat = os.stat(os.path.join(root, name))
+                mtime = max(mtime, stat.st_mtime)
+                size += stat.st_size
+        return mtime, size